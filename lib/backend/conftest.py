@@ -0,0 +1,2 @@
+# test_server.py is a development stand-in for the Flask backend, not a test module
+collect_ignore = ['test_server.py']
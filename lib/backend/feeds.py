@@ -0,0 +1,164 @@
+import gzip
+import json
+import time
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from weather_proxy import fetch_json
+
+# Brotli is optional; feeds fall back to gzip without it
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    print("⚠️ brotli not available - feeds will use gzip only")
+    BROTLI_AVAILABLE = False
+
+
+class VersionedFeed(ABC):
+    """Polled JSON document served as numbered versions with delta sync.
+
+    The upstream document is flattened into {item_key: value}; each change
+    bumps the version and keeps the flattened snapshot, so a client that
+    sends ?since=<version> only gets the items that changed or were removed.
+    Rendered (and compressed) bodies are memoized per version, since every
+    polling client asks for the same few representations. Last-Modified moves
+    forward at least a second per version, so clients that only send
+    If-Modified-Since never miss a change made within the same second.
+    """
+
+    MAX_HISTORY = 50
+    MAX_RENDERED = 256
+
+    def __init__(self, name, url, refresh_interval=60):
+        self.name = name
+        self.url = url
+        self.refresh_interval = refresh_interval
+        self.version = 0
+        self.last_modified = None
+        self.history = OrderedDict()
+        self._rendered = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @abstractmethod
+    def flatten(self, data):
+        """Turn the upstream document into {item_key: value}"""
+
+    @abstractmethod
+    def build(self, flat, language):
+        """Turn (part of) a flattened snapshot back into the client's document shape"""
+
+    def removed_keys(self, keys):
+        return list(keys)
+
+    def start(self):
+        """Start polling the upstream document (idempotent)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f'{self.name}-feed', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self.refresh()
+            time.sleep(self.refresh_interval)
+
+    def refresh(self):
+        """Fetch upstream and record a new version if anything changed"""
+        try:
+            flat = self.flatten(fetch_json(self.url))
+        except Exception as e:
+            print(f"❌ {self.name} feed refresh failed: {e}")
+            return
+
+        with self._lock:
+            if self.history and self.history[self.version] == flat:
+                return
+            self.version += 1
+            now = datetime.now(timezone.utc).replace(microsecond=0)
+            if self.last_modified is not None:
+                now = max(now, self.last_modified + timedelta(seconds=1))
+            self.last_modified = now
+            self.history[self.version] = flat
+            while len(self.history) > self.MAX_HISTORY:
+                self.history.popitem(last=False)
+            self._rendered.clear()
+        print(f"🔄 {self.name} feed updated to version {self.version} ({len(flat)} items)")
+
+    def render(self, since, language, encoding):
+        """Return (version, last_modified, etag, body) for a request, or None before the first fetch"""
+        with self._lock:
+            if not self.history:
+                return None
+            version = self.version
+            last_modified = self.last_modified
+            current = self.history[version]
+            base = self.history.get(since) if since is not None else None
+            cache_key = (version, since if base is not None else None, language, encoding)
+            rendered = self._rendered.get(cache_key)
+        if rendered is not None:
+            return rendered
+
+        if base is None:
+            payload = {'version': version, 'full': True, self.name: self.build(current, language)}
+        else:
+            changed = {key: value for key, value in current.items() if base.get(key) != value}
+            payload = {
+                'version': version,
+                'full': False,
+                'since': since,
+                'changed': self.build(changed, language),
+                'removed': self.removed_keys(key for key in base if key not in current)
+            }
+
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        if encoding == 'br':
+            body = brotli.compress(body)
+        elif encoding == 'gzip':
+            body = gzip.compress(body)
+
+        etag = f"{self.name}-{version}-{cache_key[1]}-{language}-{encoding}"
+        rendered = (version, last_modified, etag, body)
+        with self._lock:
+            if len(self._rendered) >= self.MAX_RENDERED:
+                self._rendered.clear()
+            self._rendered[cache_key] = rendered
+        return rendered
+
+class NotificationFeed(VersionedFeed):
+    """notification.json: {"notifications": [{"id", "title", "message", "timestamp"}]}"""
+
+    def flatten(self, data):
+        return {item['id']: item for item in data.get('notifications', []) if 'id' in item}
+
+    def build(self, flat, language):
+        return sorted(flat.values(), key=lambda item: str(item.get('timestamp', '')), reverse=True)
+
+class TranslationFeed(VersionedFeed):
+    """language.json: {page: {key: {"english": ..., "hindi": ...}}}, sliceable per language"""
+
+    LANGUAGE_KEYS = {
+        'en': 'english', 'hi': 'hindi', 'mr': 'marathi', 'pa': 'punjabi', 'kn': 'kannada', 'ta': 'tamil',
+        'te': 'telugu', 'ml': 'malayalam', 'gu': 'gujarati', 'bn': 'bengali', 'or': 'odia', 'ur': 'urdu'
+    }
+
+    def flatten(self, data):
+        return {
+            (page, key): texts
+            for page, keys in data.items() if isinstance(keys, dict)
+            for key, texts in keys.items()
+        }
+
+    def build(self, flat, language):
+        language_key = self.LANGUAGE_KEYS.get(language) if language else None
+        nested = {}
+        for (page, key), texts in flat.items():
+            if language_key and isinstance(texts, dict):
+                texts = {language_key: texts.get(language_key) or texts.get('english')}
+            nested.setdefault(page, {})[key] = texts
+        return nested
+
+    def removed_keys(self, keys):
+        return [[page, key] for page, key in keys]
@@ -0,0 +1,154 @@
+import re
+import json
+import math
+from collections import Counter, defaultdict
+
+
+class AgronomyKnowledgeIndex:
+    """BM25 inverted index over the curated multilingual advisory corpus.
+
+    Built once at startup and shared by every request thread. Stable questions
+    (sowing windows, fertilizer doses, common pests) are answered straight from
+    the index; weaker matches are handed to Gemini as reference notes.
+    """
+
+    # Split on whitespace and punctuation only, so Indic vowel signs stay inside their words
+    TOKEN_PATTERN = re.compile(r"[^\s.,!?;:'\"()\[\]{}<>/\\|।॥،؟۔+=*&%#@~`-]+")
+
+    STOPWORDS = {
+        'a', 'an', 'the', 'is', 'are', 'to', 'of', 'in', 'on', 'for', 'my', 'me', 'i',
+        'do', 'does', 'should', 'can', 'what', 'how', 'which', 'and', 'or', 'with', 'please',
+        'का', 'की', 'के', 'में', 'है', 'हैं', 'को', 'क्या', 'कैसे', 'मैं', 'और', 'से', 'पर', 'करें',
+        'ची', 'चे', 'चा', 'मध्ये', 'आहे', 'काय', 'कसे', 'कशी', 'मी', 'व', 'आणि', 'ला', 'करावी', 'करावे'
+    }
+
+    # Thresholds on the idf-weighted share of query terms an entry covers. Answering
+    # directly needs nearly every word of the question matched, plus one of the
+    # entry's topic_keywords, so a single shared word (a crop name) is never enough.
+    DIRECT_CONFIDENCE = 0.9
+    CONTEXT_CONFIDENCE = 0.3
+    # The best entry must clearly beat the runner-up before it is served on its own
+    DIRECT_MARGIN = 1.3
+
+    def __init__(self, corpus_path, k1=1.5, b=0.75):
+        self.corpus_path = corpus_path
+        self.k1 = k1
+        self.b = b
+        self.entries = []
+        self.postings = {}
+        self.doc_lengths = []
+        self.topic_terms = []
+        self.avg_doc_length = 0.0
+        self.idf = {}
+        self.unknown_term_weight = 1.0
+        self.load()
+
+    def tokenize(self, text):
+        """Lowercase and split text into index terms"""
+        return [token for token in self.TOKEN_PATTERN.findall(text.lower()) if token not in self.STOPWORDS]
+
+    def load(self):
+        """Read the corpus and build postings, document lengths and idf weights"""
+        try:
+            with open(self.corpus_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f).get('entries', [])
+        except Exception as e:
+            print(f"⚠️ Knowledge corpus not loaded: {e}")
+            return
+
+        postings = defaultdict(list)
+        doc_lengths = []
+        topic_terms = []
+        for doc_id, entry in enumerate(entries):
+            parts = list(entry.get('keywords', []))
+            for questions in entry.get('questions', {}).values():
+                parts.extend(questions)
+            parts.extend(entry.get('answers', {}).values())
+
+            term_counts = Counter(self.tokenize(' '.join(parts)))
+            for term, count in term_counts.items():
+                postings[term].append((doc_id, count))
+            doc_lengths.append(sum(term_counts.values()))
+            topic_terms.append(set(self.tokenize(' '.join(entry.get('topic_keywords', [])))))
+
+        total_docs = len(entries)
+        self.entries = entries
+        self.postings = dict(postings)
+        self.doc_lengths = doc_lengths
+        self.topic_terms = topic_terms
+        self.avg_doc_length = (sum(doc_lengths) / total_docs) if total_docs else 0.0
+        self.idf = {
+            term: math.log(1 + (total_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+        # Terms the corpus has never seen count as an average term, not a rare one
+        if self.idf:
+            self.unknown_term_weight = sum(self.idf.values()) / len(self.idf)
+
+        print(f"📚 Knowledge index built: {total_docs} entries, {len(self.postings)} terms")
+
+    def search(self, text, top_k=3):
+        """Return the top_k entries for a query with BM25 score, confidence and topic match"""
+        terms = set(self.tokenize(text))
+        if not terms or not self.entries:
+            return []
+
+        scores = defaultdict(float)
+        matched_terms = defaultdict(set)
+        for term in terms:
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, tf in self.postings[term]:
+                norm = tf + self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / self.avg_doc_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / norm
+                matched_terms[doc_id].add(term)
+
+        total_weight = sum(self.idf.get(term, self.unknown_term_weight) for term in terms)
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+        return [
+            {
+                'entry': self.entries[doc_id],
+                'score': score,
+                'confidence': sum(self.idf[term] for term in matched_terms[doc_id]) / total_weight,
+                'topic_matched': bool(matched_terms[doc_id] & self.topic_terms[doc_id])
+            }
+            for doc_id, score in ranked
+        ]
+
+    def lookup(self, text, language_code):
+        """Decide how a query should use the index.
+
+        Returns a dict whose 'mode' is 'direct' (with a ready answer in the
+        requested language), 'context' (with passages for the prompt) or 'none'.
+        """
+        results = self.search(text)
+        if not results:
+            return {'mode': 'none', 'passages': []}
+
+        best = results[0]
+        runner_up_score = results[1]['score'] if len(results) > 1 else 0.0
+        answer = best['entry'].get('answers', {}).get(language_code)
+
+        if (answer and best['confidence'] >= self.DIRECT_CONFIDENCE and best['topic_matched']
+                and best['score'] >= self.DIRECT_MARGIN * runner_up_score):
+            return {
+                'mode': 'direct',
+                'answer': answer,
+                'entry_id': best['entry'].get('id'),
+                'confidence': best['confidence']
+            }
+
+        passages = []
+        for result in results:
+            if result['confidence'] < self.CONTEXT_CONFIDENCE:
+                continue
+            answers = result['entry'].get('answers', {})
+            passage = answers.get(language_code) or answers.get('en')
+            if passage:
+                passages.append(passage)
+
+        if passages:
+            return {'mode': 'context', 'passages': passages, 'confidence': best['confidence']}
+        return {'mode': 'none', 'passages': []}
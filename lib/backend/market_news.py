@@ -0,0 +1,386 @@
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+
+from weather_proxy import fetch_json
+
+
+class MarketNewsAggregator:
+    """Background refresher for SerpAPI mandi prices and farm news.
+
+    Each commodity/region and news category is fetched once per interval no
+    matter how many farmers ask. Results are stored as pre-serialized JSON per
+    language (with translations done once, at refresh time) and an ETag, so a
+    request is a dictionary lookup.
+
+    Nothing is fetched for nobody: a region (configured or not) and the news
+    are only refreshed while someone asked for them within DEMAND_SECONDS. The
+    first ask after an idle spell schedules an immediate refresh.
+    """
+
+    VEGETABLES = ['tomato', 'potato', 'onion', 'cabbage', 'cauliflower', 'brinjal']
+    FRUITS = ['apple', 'banana', 'mango', 'orange', 'grapes', 'pomegranate']
+    CROPS = ['wheat', 'rice', 'cotton', 'sugarcane', 'maize', 'soybean']
+
+    NEWS_CATEGORIES = {
+        'All News': ['agriculture farming India', 'farming news India', 'crop prices India'],
+        'Government Schemes': [
+            'PM Kisan Yojana India', 'Pradhan Mantri Fasal Bima Yojana', 'PM Krishi Sinchai Yojana',
+            'government agriculture scheme India', 'farmer welfare scheme India'
+        ],
+        'Market & Prices': [
+            'crop prices India mandi', 'agriculture market India',
+            'MSP minimum support price India', 'commodity prices India'
+        ],
+        'Technology': [
+            'agriculture technology India', 'farming drone India', 'digital agriculture India', 'AgriTech India'
+        ],
+        'Weather & Climate': [
+            'weather forecast farming India', 'monsoon agriculture India',
+            'climate change farming India', 'rainfall agriculture India'
+        ],
+        'Policies': [
+            'agriculture policy India', 'farming laws India', 'agricultural reforms India', 'farmer bills India'
+        ]
+    }
+
+    # Same pattern the Flutter market page used on SerpAPI snippets
+    PRICE_PATTERN = re.compile(r'[₹Rs\.]\s*(\d{1,5}(?:,\d{3})*(?:\.\d{2})?)')
+
+    # Regions clients ask for beyond the configured ones: capped, least recently
+    # asked evicted first, and dropped once nobody has asked for them in a day.
+    # Each new region costs a full round of searches, so only a few may be added per hour.
+    MAX_REQUESTED_REGIONS = 50
+    MAX_NEW_REGIONS_PER_HOUR = 10
+    REGION_IDLE_SECONDS = 24 * 60 * 60
+    # Scheduled refreshes only run for regions/news asked for this recently
+    DEMAND_SECONDS = 3 * 60 * 60
+    MAX_ARTICLES = 10
+    MAX_TRANSLATIONS = 20000
+
+    def __init__(self, api_key, translator, languages, regions,
+                 base_url='https://serpapi.com/search.json',
+                 market_interval=60 * 60, news_interval=60 * 60, request_delay=0.8):
+        self.api_key = api_key
+        self.translator = translator
+        self.languages = list(languages)
+        self.base_url = base_url
+        self.market_interval = market_interval
+        self.news_interval = news_interval
+        self.request_delay = request_delay
+
+        self.regions = [self.normalize_region(region) for region in regions]
+        self._requested_regions = OrderedDict()
+        self._configured_asked = {}
+        self._new_region_times = deque()
+        self._pending_regions = set()
+        self._news_asked = None
+        self._news_pending = False
+        self._next_market = 0.0
+        self._next_news = 0.0
+        self._last_prices = {}
+        self._feeds = {}
+        self._translations = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def normalize_region(location):
+        """'Mumbai, Maharashtra' -> 'Mumbai'"""
+        return location.split(',')[0].strip().title()
+
+    @staticmethod
+    def is_valid_region(region):
+        """Place names only: non-empty, short, no digits"""
+        return 0 < len(region) <= 60 and not any(char.isdigit() for char in region)
+
+    def start(self):
+        """Start the refresher thread (idempotent)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='market-news-refresher', daemon=True)
+            self._thread.start()
+
+    def _is_idle(self, last_asked, now):
+        return last_asked is None or now - last_asked > self.DEMAND_SECONDS
+
+    def track_region(self, location):
+        """Record that a region was asked for; returns False if it is new and the hourly limit is used up.
+
+        A new region, or one nobody asked for lately, is scheduled for refresh right away.
+        """
+        region = self.normalize_region(location)
+        now = time.monotonic()
+        with self._lock:
+            if region in self.regions:
+                refresh = self._is_idle(self._configured_asked.get(region), now)
+                self._configured_asked[region] = now
+            elif region in self._requested_regions:
+                refresh = self._is_idle(self._requested_regions[region], now)
+                self._requested_regions[region] = now
+                self._requested_regions.move_to_end(region)
+            else:
+                while self._new_region_times and now - self._new_region_times[0] > 60 * 60:
+                    self._new_region_times.popleft()
+                if len(self._new_region_times) >= self.MAX_NEW_REGIONS_PER_HOUR:
+                    return False
+                self._new_region_times.append(now)
+                if len(self._requested_regions) >= self.MAX_REQUESTED_REGIONS:
+                    evicted, _ = self._requested_regions.popitem(last=False)
+                    self._forget_region(evicted)
+                self._requested_regions[region] = now
+                refresh = True
+            if refresh:
+                self._pending_regions.add(region)
+        if refresh:
+            self._wakeup.set()
+        return True
+
+    def track_news(self):
+        """Record that news was asked for; the first ask after an idle spell refreshes right away"""
+        now = time.monotonic()
+        with self._lock:
+            refresh = self._is_idle(self._news_asked, now)
+            self._news_asked = now
+            if refresh:
+                self._news_pending = True
+        if refresh:
+            self._wakeup.set()
+
+    def _forget_region(self, region):
+        """Drop a requested region's feeds and price history (caller holds the lock)"""
+        self._pending_regions.discard(region)
+        for key in [key for key in self._feeds if key[0] == 'market' and key[1] == region]:
+            del self._feeds[key]
+        for key in [key for key in self._last_prices if key[0] == region]:
+            del self._last_prices[key]
+
+    def _is_tracked(self, region):
+        """Configured or still requested (caller holds the lock)"""
+        return region in self.regions or region in self._requested_regions
+
+    def active_regions(self):
+        """Regions someone asked for within DEMAND_SECONDS; requested regions idle for a day are dropped"""
+        now = time.monotonic()
+        with self._lock:
+            for region in [r for r, last_asked in self._requested_regions.items()
+                           if now - last_asked > self.REGION_IDLE_SECONDS]:
+                del self._requested_regions[region]
+                self._forget_region(region)
+            asked = [(region, self._configured_asked.get(region)) for region in self.regions]
+            asked += list(self._requested_regions.items())
+            return [region for region, last_asked in asked if not self._is_idle(last_asked, now)]
+
+    def get_feed(self, kind, key, language):
+        """Return (etag, body) for a published feed, or None if not fetched yet"""
+        with self._lock:
+            return self._feeds.get((kind, key, language))
+
+    def run_once(self):
+        """One refresher pass: pending asks first, then scheduled refreshes still in demand.
+
+        Returns the number of seconds until the next scheduled refresh.
+        """
+        with self._lock:
+            pending = list(self._pending_regions)
+            self._pending_regions.clear()
+            news_pending = self._news_pending
+            self._news_pending = False
+            news_wanted = not self._is_idle(self._news_asked, time.monotonic())
+
+        if pending:
+            self.refresh_market(pending)
+        if news_pending:
+            self.refresh_news()
+            self._next_news = time.monotonic() + self.news_interval
+
+        now = time.monotonic()
+        if now >= self._next_market:
+            self.refresh_market([region for region in self.active_regions() if region not in pending])
+            self._next_market = time.monotonic() + self.market_interval
+        if now >= self._next_news:
+            if news_wanted:
+                self.refresh_news()
+            self._next_news = time.monotonic() + self.news_interval
+
+        return max(1.0, min(self._next_market, self._next_news) - time.monotonic())
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(timeout=self.run_once())
+            self._wakeup.clear()
+
+    def _search(self, **params):
+        params['api_key'] = self.api_key
+        return fetch_json(self.base_url, params, timeout=15)
+
+    def _translate(self, text, language):
+        """Translate once per (text, language); falls back to the original text"""
+        if not text or language == 'en':
+            return text
+        key = (text, language)
+        cached = self._translations.get(key)
+        if cached is not None:
+            return cached
+        try:
+            translated = self.translator.translate(text, dest=language).text
+        except Exception as e:
+            print(f"⚠️ Feed translation to {language} failed: {e}")
+            return text
+        if len(self._translations) >= self.MAX_TRANSLATIONS:
+            self._translations.clear()
+        self._translations[key] = translated
+        return translated
+
+    def _publish(self, kind, key, payloads):
+        """Serialize one payload per language and store it with its ETag.
+
+        The ETag covers everything but 'updated_at', so a refresh that brings
+        no new data keeps the old feed and clients keep getting 304s.
+        """
+        feeds = {}
+        for language, payload in payloads.items():
+            content = {field: value for field, value in payload.items() if field != 'updated_at'}
+            etag = hashlib.sha1(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest()[:20]
+            body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            feeds[(kind, key, language)] = (etag, body)
+        with self._lock:
+            for feed_key, feed in feeds.items():
+                current = self._feeds.get(feed_key)
+                if current is None or current[0] != feed[0]:
+                    self._feeds[feed_key] = feed
+
+    def _commodity_category(self, commodity):
+        if commodity in self.VEGETABLES:
+            return 'Vegetables'
+        if commodity in self.FRUITS:
+            return 'Fruits'
+        if commodity in self.CROPS:
+            return 'Crops'
+        return 'Other'
+
+    def _commodity_unit(self, commodity):
+        if commodity in self.CROPS:
+            return 'quintal'
+        if commodity == 'banana':
+            return 'dozen'
+        return 'kg'
+
+    def _parse_price(self, data):
+        """Pull the first plausible rupee price out of SerpAPI organic results"""
+        for result in data.get('organic_results', []) or []:
+            text = f"{result.get('snippet', '')} {result.get('title', '')}"
+            match = self.PRICE_PATTERN.search(text)
+            if not match:
+                continue
+            try:
+                price = float(match.group(1).replace(',', ''))
+            except ValueError:
+                continue
+            if 0 < price < 100000:
+                return price
+        return None
+
+    def refresh_market(self, regions):
+        for region in regions:
+            prices = []
+            for commodity in self.VEGETABLES + self.FRUITS + self.CROPS:
+                # Stop spending searches on a region that was evicted mid-refresh
+                with self._lock:
+                    if not self._is_tracked(region):
+                        break
+                try:
+                    data = self._search(q=f"{commodity} mandi price {region} india today",
+                                        engine='google', gl='in', hl='en', num=5)
+                    price = self._parse_price(data)
+                except Exception as e:
+                    print(f"❌ Market fetch failed for {commodity} in {region}: {e}")
+                    price = None
+
+                if price is not None:
+                    with self._lock:
+                        # Never write history back for a region _forget_region already dropped
+                        if not self._is_tracked(region):
+                            break
+                        previous = self._last_prices.get((region, commodity))
+                        self._last_prices[(region, commodity)] = price
+                    change = round((price - previous) / previous * 100, 2) if previous else 0.0
+                    prices.append({
+                        'commodity': commodity,
+                        'price': price,
+                        'change': change,
+                        'unit': self._commodity_unit(commodity),
+                        'category': self._commodity_category(commodity),
+                        'location': f"{region} Mandi"
+                    })
+                time.sleep(self.request_delay)
+
+            # The region may have been evicted while its prices were being fetched
+            with self._lock:
+                still_tracked = self._is_tracked(region)
+            if not still_tracked:
+                continue
+
+            updated_at = datetime.now().isoformat(timespec='seconds')
+            self._publish('market', region, {
+                language: {
+                    'success': True,
+                    'region': region,
+                    'updated_at': updated_at,
+                    'prices': [
+                        dict(item, name=self._translate(item['commodity'].capitalize(), language))
+                        for item in prices
+                    ]
+                }
+                for language in self.languages
+            })
+            print(f"📈 Market prices refreshed for {region}: {len(prices)} commodities")
+
+    def refresh_news(self):
+        for category, queries in self.NEWS_CATEGORIES.items():
+            articles = []
+            seen_links = set()
+            for query in queries:
+                try:
+                    data = self._search(engine='google_news', q=query, gl='in', hl='en')
+                except Exception as e:
+                    print(f"❌ News fetch failed for '{query}': {e}")
+                    continue
+                for item in data.get('news_results', []) or []:
+                    link = item.get('link', '')
+                    if not item.get('title') or link in seen_links:
+                        continue
+                    seen_links.add(link)
+                    source = item.get('source')
+                    thumbnail = item.get('thumbnail')
+                    articles.append({
+                        'title': item.get('title', ''),
+                        'snippet': item.get('snippet', ''),
+                        'link': link,
+                        'source': source.get('name', '') if isinstance(source, dict) else (source or ''),
+                        'thumbnail': thumbnail.get('url', '') if isinstance(thumbnail, dict) else (thumbnail or ''),
+                        'date': item.get('date', '')
+                    })
+                time.sleep(self.request_delay)
+
+            articles = articles[:self.MAX_ARTICLES]
+            updated_at = datetime.now().isoformat(timespec='seconds')
+            self._publish('news', category, {
+                language: {
+                    'success': True,
+                    'category': category,
+                    'updated_at': updated_at,
+                    'articles': [
+                        dict(article,
+                             title=self._translate(article['title'], language),
+                             snippet=self._translate(article['snippet'], language))
+                        for article in articles
+                    ]
+                }
+                for language in self.languages
+            })
+            print(f"📰 News refreshed for {category}: {len(articles)} articles")
@@ -0,0 +1,153 @@
+import os
+import time
+import threading
+
+
+def is_acceptable_response(response_text, target_language):
+    """Cheap quality gate for model answers: long enough and mostly in the target script"""
+    text = (response_text or '').strip()
+    if len(text) < 20:
+        return False
+    if target_language == 'en':
+        return True
+    letters = [char for char in text if char.isalpha()]
+    ascii_letters = sum(1 for char in letters if char.isascii())
+    # A few Latin terms (NPK, DAP, product names) are fine; whole English answers are not
+    return ascii_letters <= 0.2 * len(letters)
+
+class ModelRouter:
+    """Routes Gemini calls across tiers of models, cheapest first.
+
+    Queries are classified by cheap features (length, image, symptom-like
+    intent) into a starting tier. If a tier errors, times out or its answer
+    fails the caller's check, the next, stronger tier is tried. Latency,
+    tokens and, for tiers with a known price, estimated cost are recorded per tier.
+
+    model_factory builds a model from a name and only needs to return an
+    object with generate_content(), so a local fake can stand in for Gemini.
+    """
+
+    # Words that signal a diagnosis-style question, which goes straight to the capable tier
+    SYMPTOM_KEYWORDS = {
+        'disease', 'pest', 'insect', 'spots', 'spot', 'yellow', 'yellowing', 'wilt', 'wilting', 'rot',
+        'blight', 'fungus', 'curl', 'dying', 'symptom', 'symptoms',
+        'रोग', 'बीमारी', 'कीट', 'कीड़े', 'धब्बे', 'पीली', 'पीले', 'मुरझा', 'सड़', 'फफूंद',
+        'कीड', 'ठिपके', 'पिवळी', 'पिवळे', 'करपा', 'बुरशी', 'कुज', 'मर'
+    }
+    LONG_QUERY_WORDS = 40
+
+    def __init__(self, tiers, model_factory):
+        self.tiers = tiers
+        self.models = {tier['name']: model_factory(tier['model']) for tier in tiers}
+        self.stats = {
+            tier['name']: {
+                'calls': 0, 'failures': 0, 'rejected': 0, 'latency_total': 0.0,
+                'prompt_tokens': 0, 'output_tokens': 0
+            }
+            for tier in tiers
+        }
+        # Cost is only tracked for tiers with a known price; a made-up zero would be misleading
+        for tier in tiers:
+            if self.is_priced(tier):
+                self.stats[tier['name']]['cost'] = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_priced(tier):
+        return tier.get('input_cost') is not None and tier.get('output_cost') is not None
+
+    def classify(self, text, has_image=False):
+        """Pick the starting tier index for a query"""
+        if len(self.tiers) == 1:
+            return 0
+        words = (text or '').lower().split()
+        if has_image or len(words) > self.LONG_QUERY_WORDS:
+            return len(self.tiers) - 1
+        if any(word.strip('.,!?।') in self.SYMPTOM_KEYWORDS for word in words):
+            return len(self.tiers) - 1
+        return 0
+
+    def _record(self, tier, latency, response=None, failed=False, rejected=False):
+        usage = getattr(response, 'usage_metadata', None)
+        prompt_tokens = getattr(usage, 'prompt_token_count', 0) or 0
+        output_tokens = getattr(usage, 'candidates_token_count', 0) or 0
+        with self._lock:
+            stats = self.stats[tier['name']]
+            stats['calls'] += 1
+            stats['latency_total'] += latency
+            stats['failures'] += int(failed)
+            stats['rejected'] += int(rejected)
+            stats['prompt_tokens'] += prompt_tokens
+            stats['output_tokens'] += output_tokens
+            if 'cost' in stats:
+                stats['cost'] += (prompt_tokens * tier['input_cost'] + output_tokens * tier['output_cost']) / 1000000
+
+    def generate(self, contents, start_tier=0, accept=None):
+        """Generate with escalation; returns the first accepted text, else the last one produced"""
+        last_text = None
+        last_error = None
+
+        for tier in self.tiers[start_tier:]:
+            started = time.perf_counter()
+            try:
+                response = self.models[tier['name']].generate_content(
+                    contents, request_options={'timeout': tier['timeout']}
+                )
+                text = response.text
+            except Exception as e:
+                self._record(tier, time.perf_counter() - started, failed=True)
+                print(f"⚠️ {tier['name']} model ({tier['model']}) failed: {e}")
+                last_error = e
+                continue
+
+            if accept is None or accept(text):
+                self._record(tier, time.perf_counter() - started, response)
+                return text
+
+            self._record(tier, time.perf_counter() - started, response, rejected=True)
+            print(f"⚠️ {tier['name']} model answer failed quality checks, escalating")
+            last_text = text
+
+        if last_text is not None:
+            return last_text
+        raise last_error
+
+    def snapshot(self):
+        """Per-tier counters with average latency"""
+        with self._lock:
+            result = {}
+            for tier in self.tiers:
+                stats = dict(self.stats[tier['name']])
+                stats['model'] = tier['model']
+                stats['avg_latency'] = stats['latency_total'] / stats['calls'] if stats['calls'] else 0.0
+                result[tier['name']] = stats
+            return result
+
+# Published prices in USD per million tokens (input, output). Models without a
+# published price (e.g. experimental ones) report no cost unless one is configured.
+PUBLISHED_PRICES = {
+    'gemini-2.0-flash-lite': (0.075, 0.30),
+    'gemini-2.0-flash': (0.10, 0.40)
+}
+
+def model_tier(name, env_prefix, default_model, default_timeout):
+    """Tier settings from <env_prefix>_MODEL/_TIMEOUT/_INPUT_COST/_OUTPUT_COST"""
+    model = os.environ.get(f'{env_prefix}_MODEL', default_model)
+    input_cost, output_cost = PUBLISHED_PRICES.get(model, (None, None))
+    if f'{env_prefix}_INPUT_COST' in os.environ:
+        input_cost = float(os.environ[f'{env_prefix}_INPUT_COST'])
+    if f'{env_prefix}_OUTPUT_COST' in os.environ:
+        output_cost = float(os.environ[f'{env_prefix}_OUTPUT_COST'])
+    return {
+        'name': name,
+        'model': model,
+        'timeout': float(os.environ.get(f'{env_prefix}_TIMEOUT', default_timeout)),
+        'input_cost': input_cost,
+        'output_cost': output_cost
+    }
+
+# Model tiers, cheapest first; the capable tier keeps the model the agent always used
+MODEL_TIERS = [
+    model_tier('fast', 'GEMINI_FAST', 'gemini-2.0-flash-lite', 15),
+    model_tier('capable', 'GEMINI_CAPABLE', 'gemini-2.0-flash-exp', 60)
+]
@@ -0,0 +1,162 @@
+import os
+import json
+import math
+import time
+import threading
+from collections import defaultdict
+
+
+class NearbyPlacesIndex:
+    """Grid index over the local dataset of agri-input retailers and clinics.
+
+    Places are bucketed into fixed-size lat/lon cells, so radius and
+    k-nearest queries only look at the handful of cells around the farmer.
+    The dataset file is re-checked periodically and only the places that were
+    added, changed or removed are moved in the grid.
+
+    Dataset format: {"places": [{"place_id", "name", "latitude", "longitude",
+    "category": "retailer" | "clinic", "address", "types", "rating", ...}]}
+    """
+
+    CELL_DEGREES = 0.05
+    EARTH_RADIUS_M = 6371000.0
+    MAX_SEARCH_RADIUS_M = 200000.0
+
+    def __init__(self, dataset_path, reload_interval=60):
+        self.dataset_path = dataset_path
+        self.reload_interval = reload_interval
+        self.places = {}
+        self.cells = defaultdict(set)
+        self._mtime = None
+        self._lock = threading.RLock()
+        self._thread = None
+        self.reload_if_changed()
+
+    def start(self):
+        """Start watching the dataset file for changes (idempotent)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name='nearby-index-watcher', daemon=True)
+            self._thread.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.reload_interval)
+            self.reload_if_changed()
+
+    def _cell(self, lat, lon):
+        return (math.floor(lat / self.CELL_DEGREES), math.floor(lon / self.CELL_DEGREES))
+
+    def _search_text(self, place):
+        types = ' '.join(place.get('types', []) or [])
+        return f"{place.get('name', '')} {place.get('address', '')} {types}".lower()
+
+    def reload_if_changed(self):
+        """Apply an incremental update if the dataset file changed since the last load"""
+        try:
+            mtime = os.path.getmtime(self.dataset_path)
+        except OSError:
+            if self._mtime is None:
+                print(f"⚠️ Nearby places dataset not found: {self.dataset_path}")
+                self._mtime = 0
+            return
+        if mtime == self._mtime:
+            return
+
+        try:
+            with open(self.dataset_path, 'r', encoding='utf-8') as f:
+                records = json.load(f).get('places', [])
+        except Exception as e:
+            print(f"❌ Could not load nearby places dataset: {e}")
+            return
+
+        incoming = {}
+        for record in records:
+            try:
+                place_id = str(record['place_id'])
+                lat = float(record['latitude'])
+                lon = float(record['longitude'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            place = dict(record, place_id=place_id, latitude=lat, longitude=lon)
+            place['_text'] = self._search_text(place)
+            incoming[place_id] = place
+
+        with self._lock:
+            removed = [place_id for place_id in self.places if place_id not in incoming]
+            for place_id in removed:
+                self._remove(place_id)
+
+            changed = 0
+            for place_id, place in incoming.items():
+                if self.places.get(place_id) != place:
+                    self._remove(place_id)
+                    self.places[place_id] = place
+                    self.cells[self._cell(place['latitude'], place['longitude'])].add(place_id)
+                    changed += 1
+            self._mtime = mtime
+
+        print(f"📍 Nearby index updated: {len(self.places)} places ({changed} added/changed, {len(removed)} removed)")
+
+    def _remove(self, place_id):
+        place = self.places.pop(place_id, None)
+        if place is None:
+            return
+        cell = self._cell(place['latitude'], place['longitude'])
+        self.cells[cell].discard(place_id)
+        if not self.cells[cell]:
+            del self.cells[cell]
+
+    def distance_m(self, lat1, lon1, lat2, lon2):
+        """Haversine distance in metres"""
+        phi1, phi2 = math.radians(lat1), math.radians(lat2)
+        d_phi = phi2 - phi1
+        d_lambda = math.radians(lon2 - lon1)
+        a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+        return 2 * self.EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+    def _within(self, lat, lon, radius_m, category=None, text=None):
+        """All matching places within radius_m as (distance, place), unsorted"""
+        lat_span = math.degrees(radius_m / self.EARTH_RADIUS_M)
+        lon_span = lat_span / max(math.cos(math.radians(lat)), 0.01)
+        min_cell = self._cell(lat - lat_span, lon - lon_span)
+        max_cell = self._cell(lat + lat_span, lon + lon_span)
+
+        matches = []
+        for cell_lat in range(min_cell[0], max_cell[0] + 1):
+            for cell_lon in range(min_cell[1], max_cell[1] + 1):
+                for place_id in self.cells.get((cell_lat, cell_lon), ()):
+                    place = self.places[place_id]
+                    if category and place.get('category') != category:
+                        continue
+                    if text and text not in place['_text']:
+                        continue
+                    distance = self.distance_m(lat, lon, place['latitude'], place['longitude'])
+                    if distance <= radius_m:
+                        matches.append((distance, place))
+        return matches
+
+    def _result(self, distance, place):
+        result = {key: value for key, value in place.items() if not key.startswith('_')}
+        result['distance'] = round(distance, 1)
+        return result
+
+    def radius_search(self, lat, lon, radius_m, limit=50, category=None, text=None):
+        """Matching places within radius_m, nearest first"""
+        text = text.lower().strip() if text else None
+        with self._lock:
+            matches = self._within(lat, lon, radius_m, category, text)
+        matches.sort(key=lambda match: match[0])
+        return [self._result(distance, place) for distance, place in matches[:limit]]
+
+    def nearest(self, lat, lon, k=10, category=None, text=None):
+        """The k nearest matching places, widening the search ring until k are found"""
+        text = text.lower().strip() if text else None
+        radius_m = self.CELL_DEGREES * 111000.0
+        with self._lock:
+            while True:
+                matches = self._within(lat, lon, radius_m, category, text)
+                if len(matches) >= k or radius_m >= self.MAX_SEARCH_RADIUS_M:
+                    break
+                radius_m = min(radius_m * 2, self.MAX_SEARCH_RADIUS_M)
+        matches.sort(key=lambda match: match[0])
+        return [self._result(distance, place) for distance, place in matches[:k]]
@@ -0,0 +1,229 @@
+import os
+import re
+import json
+import time
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from knowledge_index import AgronomyKnowledgeIndex
+from model_router import is_acceptable_response
+
+
+def normalize_query(text):
+    """Lowercase and strip punctuation so trivially different phrasings share a cache key"""
+    return ' '.join(AgronomyKnowledgeIndex.TOKEN_PATTERN.findall((text or '').lower()))
+
+def crop_season(timestamp):
+    """Indian crop season for a unix timestamp: kharif (Jun-Oct), rabi (Nov-Mar) or zaid (Apr-May)"""
+    month = datetime.fromtimestamp(timestamp).month
+    if 6 <= month <= 10:
+        return 'kharif'
+    if month >= 11 or month <= 3:
+        return 'rabi'
+    return 'zaid'
+
+class ResponseCache:
+    """Text-query answer cache keyed by (language, normalized query).
+
+    Pre-warmed answers are read from a file produced by the offline job and
+    held in their own dict, which a reload replaces in one assignment, so
+    requests see either the old set or the new one. Answers generated at
+    runtime go into a bounded LRU on top.
+    """
+
+    def __init__(self, path, max_entries=2000, ttl=24 * 60 * 60, reload_interval=60):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.reload_interval = reload_interval
+        self._prewarmed = {}
+        self._live = OrderedDict()
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self.stats = {'hits': 0, 'prewarmed_hits': 0, 'misses': 0}
+        self.reload_if_changed()
+
+    def get(self, language_code, text):
+        key = (language_code, normalize_query(text))
+        with self._lock:
+            entry = self._live.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._live.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry[1]
+            answer = self._prewarmed.get(key)
+            if answer is not None:
+                self.stats['prewarmed_hits'] += 1
+            else:
+                self.stats['misses'] += 1
+            return answer
+
+    def put(self, language_code, text, answer):
+        key = (language_code, normalize_query(text))
+        with self._lock:
+            self._live[key] = (time.monotonic() + self.ttl, answer)
+            self._live.move_to_end(key)
+            while len(self._live) > self.max_entries:
+                self._live.popitem(last=False)
+
+    def start_watching(self):
+        """Pick up a new pre-warm file while running (idempotent)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name='response-cache-watcher', daemon=True)
+            self._thread.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.reload_interval)
+            self.reload_if_changed()
+
+    def reload_if_changed(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f).get('entries', [])
+            prewarmed = {
+                (entry['language'], normalize_query(entry['query'])): entry['response']
+                for entry in entries
+            }
+        except Exception as e:
+            print(f"❌ Could not load pre-warmed responses: {e}")
+            return
+
+        self._prewarmed = prewarmed
+        self._mtime = mtime
+        print(f"🔥 Loaded {len(prewarmed)} pre-warmed responses")
+
+class QueryLog:
+    """Append-only JSONL log of text queries, mined by the pre-warm job.
+
+    Only the time, language and normalized text are kept, with no user or
+    device identifiers. Numbers of six or more digits are masked even when
+    split by spaces or dashes (phone numbers, IDs), but the free text itself
+    can still identify a farmer, so treat the file as personal data. Once it
+    reaches max_bytes it is rotated to <path>.1, replacing the older backup.
+    """
+
+    # Six or more digits, optionally separated by spaces or dashes
+    DIGIT_GROUP_PATTERN = re.compile(r'\d(?:[\s-]*\d){5,}')
+    # normalize_query strips '#', so it only appears in logged queries as this mask
+    MASK = '#'
+
+    def __init__(self, path, max_bytes=20 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def record(self, text, language_code):
+        query = self.DIGIT_GROUP_PATTERN.sub(self.MASK, normalize_query(text))
+        if not query:
+            return
+        line = json.dumps({'ts': int(time.time()), 'language': language_code, 'query': query}, ensure_ascii=False)
+        try:
+            with self._lock:
+                if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+                    os.replace(self.path, f"{self.path}.1")
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(line + '\n')
+        except Exception as e:
+            print(f"⚠️ Could not write query log: {e}")
+
+def prewarm_response_cache(agent, log_path, output_path, top_n=50, concurrency=4, all_seasons=False, min_count=2):
+    """Offline job: pre-generate answers for the top-N logged questions per language and season.
+
+    Only the current crop season is mined unless all_seasons is set. Queries
+    asked fewer than min_count times are skipped, so one-off free text is
+    never copied into the pre-warm file, and so are queries with masked
+    numbers: no real query normalizes to the same key, so their answers could
+    never be served. Questions the knowledge index answers directly are left
+    out before ranking (and of the coverage estimate), so they keep following
+    corpus updates. Answers are written atomically to output_path, where
+    ResponseCache picks them up at startup or on its next reload check.
+    Returns the coverage estimate: the share of the remaining logged queries
+    (in the mined seasons) the new set answers.
+    """
+    current_season = crop_season(time.time())
+    counts = defaultdict(Counter)
+    masked = 0
+    # Include the rotated backup so a recent rotation doesn't halve the history
+    log_files = [path for path in (f"{log_path}.1", log_path) if os.path.exists(path)]
+    if not log_files:
+        print(f"⚠️ No query log at {log_path}; nothing to pre-warm")
+        return 0.0
+    for path in log_files:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    season = crop_season(entry['ts'])
+                    if not all_seasons and season != current_season:
+                        continue
+                    if QueryLog.MASK in entry['query']:
+                        masked += 1
+                    else:
+                        counts[(entry['language'], season)][entry['query']] += 1
+                except (ValueError, KeyError, TypeError):
+                    continue
+
+    from_index = 0
+    for (language, season), counter in counts.items():
+        for query in list(counter):
+            if agent.knowledge_index.lookup(query, language)['mode'] == 'direct':
+                from_index += counter.pop(query)
+
+    targets = sorted({
+        (language, query)
+        for (language, season), counter in counts.items()
+        for query, count in counter.most_common(top_n)
+        if count >= min_count
+    })
+    print(f"🔥 Pre-generating {len(targets)} answers with concurrency {concurrency}...")
+
+    def answer(target):
+        language, query = target
+        response = agent.process_text_query(query, language, use_cache=False)
+        # The "technical issue" fallback reads as a valid answer; never cache it
+        if response == agent.get_emergency_response(language):
+            return None
+        if response.startswith('Error processing') or not is_acceptable_response(response, language):
+            return None
+        return {'language': language, 'query': query, 'response': response}
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        entries = [entry for entry in pool.map(answer, targets) if entry is not None]
+
+    answered = {(entry['language'], entry['query']) for entry in entries}
+    # Masked queries stay in the total: they were asked, but can never be covered
+    total = masked + sum(sum(counter.values()) for counter in counts.values())
+    covered = sum(
+        count
+        for (language, season), counter in counts.items()
+        for query, count in counter.items()
+        if (language, query) in answered
+    )
+    coverage = covered / total if total else 0.0
+
+    seasons = sorted({season for _, season in counts}) if all_seasons else [current_season]
+    temp_path = f"{output_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'seasons': seasons,
+            'coverage': round(coverage, 4),
+            'entries': entries
+        }, f, ensure_ascii=False)
+    os.replace(temp_path, output_path)
+
+    print(f"✅ Pre-warmed {len(entries)}/{len(targets)} answers -> {output_path}")
+    print(f"📊 Estimated coverage: {coverage:.1%} of {total} logged queries ({', '.join(seasons)}); "
+          f"{from_index} more answered by the knowledge index")
+    return coverage
@@ -0,0 +1,149 @@
+import gzip
+import json
+from datetime import timedelta
+
+import pytest
+
+import feeds
+from feeds import NotificationFeed, TranslationFeed, VersionedFeed
+
+NOTIFICATIONS = {'notifications': [
+    {'id': 'n1', 'title': 'Rain alert', 'message': 'Heavy rain expected', 'timestamp': '2024-06-01'},
+    {'id': 'n2', 'title': 'Subsidy', 'message': 'Apply before Friday', 'timestamp': '2024-06-02'}
+]}
+
+TRANSLATIONS = {
+    'home': {'title': {'english': 'Home', 'hindi': 'होम'}, 'search': {'english': 'Search', 'hindi': 'खोजें'}},
+    'market': {'title': {'english': 'Market', 'hindi': 'मंडी'}}
+}
+
+
+class ScriptedUpstream:
+    """Stands in for fetch_json; serves whatever document is set"""
+
+    def __init__(self, document):
+        self.document = document
+
+    def __call__(self, url, params=None, timeout=10):
+        return json.loads(json.dumps(self.document))
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    upstream = ScriptedUpstream(NOTIFICATIONS)
+    monkeypatch.setattr(feeds, 'fetch_json', upstream)
+    return upstream
+
+
+def decode(rendered):
+    return json.loads(rendered[3].decode('utf-8'))
+
+
+def test_feed_needs_flatten_and_build():
+    with pytest.raises(TypeError):
+        VersionedFeed('broken', 'https://feeds.example/broken.json')
+
+
+def test_nothing_is_rendered_before_the_first_fetch():
+    assert NotificationFeed('notifications', 'https://feeds.example/n.json').render(None, None, None) is None
+
+
+def test_unchanged_upstream_keeps_the_version(upstream):
+    feed = NotificationFeed('notifications', 'https://feeds.example/n.json')
+    feed.refresh()
+    feed.refresh()
+
+    assert feed.version == 1
+    payload = decode(feed.render(None, None, None))
+    assert payload['full']
+    assert [item['id'] for item in payload['notifications']] == ['n2', 'n1']
+
+
+def test_delta_has_only_changed_and_removed_items(upstream):
+    feed = NotificationFeed('notifications', 'https://feeds.example/n.json')
+    feed.refresh()
+    first, second = NOTIFICATIONS['notifications']
+    upstream.document = {'notifications': [
+        dict(first, message='Heavy rain expected tonight'),
+        {'id': 'n3', 'title': 'Mandi', 'message': 'Onion up 5%', 'timestamp': '2024-06-03'}
+    ]}
+    feed.refresh()
+
+    payload = decode(feed.render(1, None, None))
+    assert payload['version'] == 2
+    assert not payload['full']
+    assert payload['since'] == 1
+    assert [item['id'] for item in payload['changed']] == ['n3', 'n1']
+    assert payload['removed'] == [second['id']]
+
+
+def test_unknown_since_falls_back_to_full_document(upstream):
+    feed = NotificationFeed('notifications', 'https://feeds.example/n.json')
+    feed.refresh()
+
+    assert decode(feed.render(42, None, None))['full']
+
+
+def test_translation_delta_is_sliced_per_language(monkeypatch):
+    upstream = ScriptedUpstream(TRANSLATIONS)
+    monkeypatch.setattr(feeds, 'fetch_json', upstream)
+    feed = TranslationFeed('translations', 'https://feeds.example/language.json')
+    feed.refresh()
+    upstream.document = {'home': {'title': {'english': 'Home page', 'hindi': 'मुख्य पृष्ठ'}}}
+    feed.refresh()
+
+    payload = decode(feed.render(1, 'hi', None))
+    assert payload['changed'] == {'home': {'title': {'hindi': 'मुख्य पृष्ठ'}}}
+    assert sorted(payload['removed']) == [['home', 'search'], ['market', 'title']]
+
+
+def test_etag_differs_per_version_and_representation(upstream):
+    feed = NotificationFeed('notifications', 'https://feeds.example/n.json')
+    feed.refresh()
+    etags = {feed.render(since, None, encoding)[2] for since in (None, 1) for encoding in (None, 'gzip')}
+    upstream.document = {'notifications': NOTIFICATIONS['notifications'][:1]}
+    feed.refresh()
+    etags.add(feed.render(None, None, None)[2])
+
+    assert len(etags) == 5
+
+
+def test_last_modified_moves_forward_for_changes_within_a_second(upstream):
+    feed = NotificationFeed('notifications', 'https://feeds.example/n.json')
+    seen = []
+    for i in range(3):
+        upstream.document = {'notifications': [{'id': f'n{i}', 'title': 'Update', 'message': str(i)}]}
+        feed.refresh()
+        seen.append(feed.render(None, None, None)[1])
+
+    # If-Modified-Since has one-second resolution, so each version needs a later second
+    assert feed.version == 3
+    assert all(later - earlier >= timedelta(seconds=1) for earlier, later in zip(seen, seen[1:]))
+    assert seen[0].utcoffset() == timedelta(0)
+
+
+def test_gzip_body_round_trips(upstream):
+    feed = NotificationFeed('notifications', 'https://feeds.example/n.json')
+    feed.refresh()
+
+    plain = feed.render(None, None, None)[3]
+    assert gzip.decompress(feed.render(None, None, 'gzip')[3]) == plain
+
+
+def test_brotli_body_round_trips(upstream):
+    brotli = pytest.importorskip('brotli')
+    feed = NotificationFeed('notifications', 'https://feeds.example/n.json')
+    feed.refresh()
+
+    plain = feed.render(None, None, None)[3]
+    assert brotli.decompress(feed.render(None, None, 'br')[3]) == plain
+
+
+def test_rendered_bodies_are_reused_until_the_next_version(upstream):
+    feed = NotificationFeed('notifications', 'https://feeds.example/n.json')
+    feed.refresh()
+
+    assert feed.render(None, None, 'gzip') is feed.render(None, None, 'gzip')
+    upstream.document = {'notifications': []}
+    feed.refresh()
+    assert feed.render(None, None, 'gzip')[0] == 2
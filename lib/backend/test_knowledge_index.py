@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+from knowledge_index import AgronomyKnowledgeIndex
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'agronomy_corpus.json')
+
+
+@pytest.fixture(scope='module')
+def index():
+    return AgronomyKnowledgeIndex(CORPUS_PATH)
+
+
+@pytest.mark.parametrize('question, language, entry_id', [
+    ('गेहूं की बुवाई कब करें?', 'hi', 'wheat_sowing_time'),
+    ('गव्हाला किती खत द्यावे?', 'mr', 'wheat_fertilizer'),
+    ('urea dose for paddy', 'en', 'rice_fertilizer'),
+    ('How to control fall armyworm in maize?', 'en', 'maize_fall_armyworm'),
+])
+def test_covered_questions_are_answered_directly(index, question, language, entry_id):
+    result = index.lookup(question, language)
+    assert result['mode'] == 'direct'
+    assert result['entry_id'] == entry_id
+
+
+@pytest.mark.parametrize('question', [
+    'what fertilizer for tomato',
+    'insurance for cotton crop',
+    'when to sow mustard',
+    'wheat yellow rust treatment',
+])
+def test_near_misses_are_not_answered_directly(index, question):
+    assert index.lookup(question, 'en')['mode'] != 'direct'
+
+
+def test_answer_missing_in_language_falls_back_to_context(index):
+    result = index.lookup('How to control fall armyworm in maize?', 'ta')
+    assert result['mode'] == 'context'
+    assert result['passages']
+
+
+def test_unrelated_question_uses_nothing(index):
+    assert index.lookup('hello', 'en')['mode'] == 'none'
@@ -0,0 +1,104 @@
+import time
+
+import pytest
+
+from market_news import MarketNewsAggregator
+
+COMMODITIES = len(MarketNewsAggregator.VEGETABLES + MarketNewsAggregator.FRUITS + MarketNewsAggregator.CROPS)
+NEWS_QUERIES = sum(len(queries) for queries in MarketNewsAggregator.NEWS_CATEGORIES.values())
+
+
+class CountingSearch:
+    """Stands in for SerpAPI; records every query"""
+
+    def __init__(self):
+        self.queries = []
+        self.on_call = None
+
+    def __call__(self, **params):
+        self.queries.append(params['q'])
+        if self.on_call:
+            self.on_call(len(self.queries))
+        if params.get('engine') == 'google_news':
+            return {'news_results': [{'title': params['q'], 'link': f"https://news.example/{params['q']}"}]}
+        return {'organic_results': [{'title': 'Mandi rate', 'snippet': 'Modal price ₹ 2,150 per quintal'}]}
+
+
+@pytest.fixture
+def aggregator():
+    aggregator = MarketNewsAggregator('test-key', translator=None, languages=['en'],
+                                      regions=['Delhi', 'Mumbai'], request_delay=0)
+    aggregator._search = CountingSearch()
+    return aggregator
+
+
+def test_nothing_is_fetched_without_demand(aggregator):
+    aggregator.run_once()
+    assert aggregator._search.queries == []
+
+
+def test_only_asked_regions_are_refreshed(aggregator):
+    assert aggregator.track_region('Mumbai, Maharashtra')
+    aggregator.run_once()
+
+    assert len(aggregator._search.queries) == COMMODITIES
+    assert all('Mumbai' in query for query in aggregator._search.queries)
+    assert aggregator.get_feed('market', 'Mumbai', 'en') is not None
+    assert aggregator.get_feed('market', 'Delhi', 'en') is None
+
+
+def test_news_is_refreshed_only_when_asked(aggregator):
+    aggregator.track_news()
+    aggregator.run_once()
+
+    assert len(aggregator._search.queries) == NEWS_QUERIES
+    assert aggregator.get_feed('news', 'All News', 'en') is not None
+
+
+def test_scheduled_refresh_skips_regions_nobody_asked_for_lately(aggregator):
+    aggregator.track_region('Delhi')
+    aggregator.run_once()
+    aggregator._search.queries.clear()
+
+    aggregator.DEMAND_SECONDS = 0
+    time.sleep(0.01)
+    aggregator._next_market = 0.0
+    aggregator.run_once()
+
+    assert aggregator._search.queries == []
+
+
+def test_repeat_asks_do_not_trigger_extra_refreshes(aggregator):
+    aggregator.track_region('Delhi')
+    aggregator.run_once()
+    aggregator.track_region('Delhi')
+    aggregator.run_once()
+
+    assert len(aggregator._search.queries) == COMMODITIES
+
+
+def test_new_regions_are_rate_limited(aggregator):
+    for i in range(MarketNewsAggregator.MAX_NEW_REGIONS_PER_HOUR):
+        assert aggregator.track_region(f"Village {chr(ord('A') + i)}")
+
+    assert not aggregator.track_region('One Too Many')
+    # Known regions are still served
+    assert aggregator.track_region('Village A')
+    assert aggregator.track_region('Delhi')
+
+
+def test_evicted_region_history_is_not_written_back(aggregator):
+    aggregator.track_region('Nashik')
+
+    def evict(calls):
+        if calls == 3:
+            with aggregator._lock:
+                del aggregator._requested_regions['Nashik']
+                aggregator._forget_region('Nashik')
+
+    aggregator._search.on_call = evict
+    aggregator.run_once()
+
+    assert len(aggregator._search.queries) == 3
+    assert aggregator._last_prices == {}
+    assert aggregator.get_feed('market', 'Nashik', 'en') is None
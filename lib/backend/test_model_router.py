@@ -0,0 +1,144 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from model_router import PUBLISHED_PRICES, ModelRouter, is_acceptable_response, model_tier
+
+TIERS = [
+    {'name': 'fast', 'model': 'fake-lite', 'timeout': 5, 'input_cost': 0.1, 'output_cost': 0.4},
+    {'name': 'capable', 'model': 'fake-pro', 'timeout': 30, 'input_cost': 1.0, 'output_cost': 4.0}
+]
+
+HINDI_ANSWER = 'गेहूं की बुवाई नवंबर के पहले पखवाड़े में करें।'
+ENGLISH_ANSWER = 'Sow wheat in the first half of November.'
+
+
+class FakeModel:
+    """Stands in for genai.GenerativeModel; replies are scripted per model name"""
+
+    def __init__(self, reply, prompt_tokens=100, output_tokens=50, delay=0.0):
+        self.reply = reply
+        self.prompt_tokens = prompt_tokens
+        self.output_tokens = output_tokens
+        self.delay = delay
+        self.calls = []
+
+    def generate_content(self, contents, request_options=None):
+        self.calls.append((contents, request_options))
+        time.sleep(self.delay)
+        if isinstance(self.reply, Exception):
+            raise self.reply
+        usage = SimpleNamespace(prompt_token_count=self.prompt_tokens, candidates_token_count=self.output_tokens)
+        return SimpleNamespace(text=self.reply, usage_metadata=usage)
+
+
+def make_router(**replies):
+    models = {
+        'fake-lite': FakeModel(replies.get('fast', HINDI_ANSWER)),
+        'fake-pro': FakeModel(replies.get('capable', HINDI_ANSWER))
+    }
+    return ModelRouter(TIERS, models.__getitem__), models
+
+
+def hindi_only(text):
+    return is_acceptable_response(text, 'hi')
+
+
+@pytest.mark.parametrize('text, has_image, expected', [
+    ('when to sow wheat', False, 0),
+    ('when to sow wheat', True, 1),
+    (' '.join(['word'] * (ModelRouter.LONG_QUERY_WORDS + 1)), False, 1),
+    ('my cotton leaves are yellow, why?', False, 1),
+    ('टमाटर की पत्तियां पीली क्यों हो रही हैं', False, 1),
+])
+def test_classification(text, has_image, expected):
+    router, _ = make_router()
+    assert router.classify(text, has_image=has_image) == expected
+
+
+def test_single_tier_always_starts_at_zero():
+    router = ModelRouter(TIERS[:1], lambda name: FakeModel(HINDI_ANSWER))
+    assert router.classify('my cotton leaves are yellow', has_image=True) == 0
+
+
+def test_accepted_fast_answer_does_not_escalate():
+    router, models = make_router()
+
+    assert router.generate('prompt', accept=hindi_only) == HINDI_ANSWER
+    assert len(models['fake-lite'].calls) == 1
+    assert models['fake-pro'].calls == []
+    assert models['fake-lite'].calls[0][1] == {'timeout': 5}
+
+
+def test_rejected_fast_answer_escalates():
+    router, models = make_router(fast=ENGLISH_ANSWER)
+
+    assert router.generate('prompt', accept=hindi_only) == HINDI_ANSWER
+    stats = router.snapshot()
+    assert stats['fast']['rejected'] == 1
+    assert stats['capable']['calls'] == 1
+
+
+def test_failing_fast_tier_escalates():
+    router, models = make_router(fast=TimeoutError('deadline exceeded'))
+
+    assert router.generate('prompt', accept=hindi_only) == HINDI_ANSWER
+    assert router.snapshot()['fast']['failures'] == 1
+
+
+def test_start_tier_skips_cheaper_tiers():
+    router, models = make_router()
+
+    router.generate('prompt', start_tier=1)
+    assert models['fake-lite'].calls == []
+
+
+def test_last_text_is_returned_when_every_tier_rejects():
+    router, _ = make_router(fast='No.', capable=ENGLISH_ANSWER)
+
+    assert router.generate('prompt', accept=hindi_only) == ENGLISH_ANSWER
+
+
+def test_error_is_raised_when_every_tier_fails():
+    router, _ = make_router(fast=RuntimeError('quota'), capable=RuntimeError('unavailable'))
+
+    with pytest.raises(RuntimeError, match='unavailable'):
+        router.generate('prompt')
+
+
+def test_snapshot_counts_tokens_cost_and_latency():
+    router, models = make_router(fast=ENGLISH_ANSWER)
+    models['fake-pro'].delay = 0.02
+
+    router.generate('prompt', accept=hindi_only)
+    router.generate('prompt', start_tier=1)
+    stats = router.snapshot()
+
+    assert stats['fast']['prompt_tokens'] == 100
+    assert stats['fast']['output_tokens'] == 50
+    assert stats['fast']['cost'] == pytest.approx((100 * 0.1 + 50 * 0.4) / 1000000)
+    assert stats['capable']['calls'] == 2
+    assert stats['capable']['prompt_tokens'] == 200
+    assert stats['capable']['cost'] == pytest.approx(2 * (100 * 1.0 + 50 * 4.0) / 1000000)
+    assert stats['capable']['avg_latency'] >= 0.02
+    assert stats['capable']['model'] == 'fake-pro'
+
+
+def test_unpriced_tier_reports_no_cost():
+    tiers = [dict(TIERS[0], input_cost=None, output_cost=None)]
+    router = ModelRouter(tiers, lambda name: FakeModel(HINDI_ANSWER))
+
+    router.generate('prompt')
+    assert 'cost' not in router.snapshot()['fast']
+
+
+def test_default_tiers_use_published_prices(monkeypatch):
+    monkeypatch.delenv('GEMINI_FAST_MODEL', raising=False)
+    monkeypatch.delenv('GEMINI_FAST_INPUT_COST', raising=False)
+    monkeypatch.delenv('GEMINI_FAST_OUTPUT_COST', raising=False)
+    tier = model_tier('fast', 'GEMINI_FAST', 'gemini-2.0-flash-lite', 15)
+    assert (tier['input_cost'], tier['output_cost']) == PUBLISHED_PRICES['gemini-2.0-flash-lite']
+
+    monkeypatch.setenv('GEMINI_FAST_INPUT_COST', '0.5')
+    assert model_tier('fast', 'GEMINI_FAST', 'gemini-2.0-flash-lite', 15)['input_cost'] == 0.5
@@ -0,0 +1,113 @@
+import json
+import os
+import random
+
+import pytest
+
+from nearby_places import NearbyPlacesIndex
+
+CENTER = (18.52, 73.85)
+
+
+def random_places(count, seed=7, spread=1.5):
+    rng = random.Random(seed)
+    return [
+        {
+            'place_id': f"p{i}",
+            'name': f"{rng.choice(['Krishi Seva', 'Agro Inputs', 'Pashu Clinic'])} {i}",
+            'latitude': CENTER[0] + rng.uniform(-spread, spread),
+            'longitude': CENTER[1] + rng.uniform(-spread, spread),
+            'category': rng.choice(['retailer', 'clinic']),
+            'types': rng.sample(['seeds', 'fertilizer', 'pesticide', 'veterinary'], 2)
+        }
+        for i in range(count)
+    ]
+
+
+def write_dataset(path, places, mtime=None):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'places': places}, f)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def brute_force(index, places, lat, lon, radius_m, category=None):
+    matches = []
+    for place in places:
+        if category and place['category'] != category:
+            continue
+        distance = index.distance_m(lat, lon, place['latitude'], place['longitude'])
+        if distance <= radius_m:
+            matches.append((round(distance, 1), place['place_id']))
+    return sorted(matches)
+
+
+def assert_same_matches(results, expected, candidates):
+    """Same distances in the same order; places with equal rounded distances may come in any order"""
+    found = [(place['distance'], place['place_id']) for place in results]
+    assert [distance for distance, _ in found] == [distance for distance, _ in expected]
+    assert set(found) <= set(candidates)
+
+
+@pytest.fixture(scope='module')
+def dataset(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('nearby') / 'nearby_places.json')
+    places = random_places(3000)
+    write_dataset(path, places)
+    return NearbyPlacesIndex(path), places
+
+
+def query_points(count=25, seed=11):
+    rng = random.Random(seed)
+    return [(CENTER[0] + rng.uniform(-1.6, 1.6), CENTER[1] + rng.uniform(-1.6, 1.6)) for _ in range(count)]
+
+
+@pytest.mark.parametrize('radius_m', [2000, 15000, 60000])
+def test_radius_search_matches_brute_force(dataset, radius_m):
+    index, places = dataset
+    for lat, lon in query_points():
+        for category in (None, 'clinic'):
+            expected = brute_force(index, places, lat, lon, radius_m, category)
+            results = index.radius_search(lat, lon, radius_m, limit=len(places), category=category)
+            assert_same_matches(results, expected, expected)
+
+
+@pytest.mark.parametrize('k', [1, 10, 50])
+def test_nearest_matches_brute_force(dataset, k):
+    index, places = dataset
+    for lat, lon in query_points():
+        candidates = brute_force(index, places, lat, lon, NearbyPlacesIndex.MAX_SEARCH_RADIUS_M)
+        results = index.nearest(lat, lon, k=k)
+        assert_same_matches(results, candidates[:k], candidates)
+
+
+def test_text_filter_matches_name_and_types(dataset):
+    index, places = dataset
+    results = index.nearest(*CENTER, k=20, text='Veterinary')
+    assert len(results) == 20
+    assert all('veterinary' in place['types'] for place in results)
+
+
+def test_incremental_reload(tmp_path):
+    path = str(tmp_path / 'nearby_places.json')
+    places = random_places(50, spread=0.2)
+    write_dataset(path, places, mtime=1000)
+    index = NearbyPlacesIndex(path)
+
+    moved = dict(places[0], latitude=CENTER[0] + 1.0, longitude=CENTER[1] + 1.0)
+    added = dict(places[2], place_id='new', name='New Agro Centre', latitude=CENTER[0], longitude=CENTER[1])
+    updated = [moved] + places[2:] + [added]
+    write_dataset(path, updated, mtime=2000)
+    index.reload_if_changed()
+
+    assert set(index.places) == {place['place_id'] for place in updated}
+    assert places[1]['place_id'] not in index.places
+    # Every place sits in exactly the cell of its current coordinates
+    assert sum(len(ids) for ids in index.cells.values()) == len(updated)
+    for cell, ids in index.cells.items():
+        for place_id in ids:
+            place = index.places[place_id]
+            assert index._cell(place['latitude'], place['longitude']) == cell
+    assert index.nearest(*CENTER, k=1)[0]['place_id'] == 'new'
+    assert index.nearest(moved['latitude'], moved['longitude'], k=1)[0]['place_id'] == moved['place_id']
+    assert index.radius_search(places[1]['latitude'], places[1]['longitude'], 1) == []
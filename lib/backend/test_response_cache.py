@@ -0,0 +1,111 @@
+import json
+import os
+import time
+
+import pytest
+
+from knowledge_index import AgronomyKnowledgeIndex
+from response_cache import QueryLog, ResponseCache, prewarm_response_cache
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'agronomy_corpus.json')
+
+ANSWER = 'प्याज को हर सात दिन में हल्की सिंचाई दें।'
+
+
+class FakeAgent:
+    """Answers every query with the same Hindi text and records what was asked"""
+
+    knowledge_index = AgronomyKnowledgeIndex(CORPUS_PATH)
+
+    def __init__(self):
+        self.asked = []
+
+    def process_text_query(self, text, target_language='hi', use_cache=True):
+        self.asked.append((target_language, text))
+        return ANSWER
+
+    def get_emergency_response(self, language):
+        return 'Technical issue. Please try again.'
+
+
+def write_log(path, queries, language='hi'):
+    with open(path, 'w', encoding='utf-8') as f:
+        for query in queries:
+            f.write(json.dumps({'ts': int(time.time()), 'language': language, 'query': query}, ensure_ascii=False) + '\n')
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / 'query_log.jsonl'), str(tmp_path / 'prewarmed.json')
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('Call me on 98765 43210 about onion', 'call me on # about onion'),
+    ('Account 1234-5678-9012 not credited', 'account # not credited'),
+    ('+91 98765-43210', '#'),
+    ('Apply 10 kg urea on 2 acres', 'apply 10 kg urea on 2 acres'),
+])
+def test_query_log_masks_digit_groups(paths, text, expected):
+    log_path, _ = paths
+    QueryLog(log_path).record(text, 'en')
+
+    with open(log_path, encoding='utf-8') as f:
+        assert json.loads(f.readline())['query'] == expected
+
+
+def test_query_log_rotates_at_max_bytes(paths):
+    log_path, _ = paths
+    log = QueryLog(log_path, max_bytes=100)
+    # Each line is ~75 bytes: rotation happens before the 3rd and 5th writes
+    for _ in range(5):
+        log.record('best irrigation for onion', 'en')
+
+    with open(f"{log_path}.1", encoding='utf-8') as f:
+        assert len(f.readlines()) == 2
+    with open(log_path, encoding='utf-8') as f:
+        assert len(f.readlines()) == 1
+
+
+def test_prewarmed_answers_are_served_for_equivalent_queries(paths):
+    log_path, output_path = paths
+    write_log(log_path, ['best irrigation for onion'] * 3)
+
+    coverage = prewarm_response_cache(FakeAgent(), log_path, output_path)
+
+    assert coverage == 1.0
+    assert ResponseCache(output_path).get('hi', 'Best irrigation for onion?') == ANSWER
+
+
+def test_masked_queries_are_not_mined_or_covered(paths):
+    log_path, output_path = paths
+    write_log(log_path, ['call me on # about wheat'] * 3 + ['best irrigation for onion'] * 3)
+    agent = FakeAgent()
+
+    coverage = prewarm_response_cache(agent, log_path, output_path)
+
+    assert agent.asked == [('hi', 'best irrigation for onion')]
+    assert coverage == 0.5
+
+
+def test_queries_below_min_count_are_not_persisted(paths):
+    log_path, output_path = paths
+    write_log(log_path, ['my field near ramesh house floods'] + ['best irrigation for onion'] * 2)
+
+    prewarm_response_cache(FakeAgent(), log_path, output_path)
+    with open(output_path, encoding='utf-8') as f:
+        assert [entry['query'] for entry in json.load(f)['entries']] == ['best irrigation for onion']
+
+    prewarm_response_cache(FakeAgent(), log_path, output_path, min_count=3)
+    with open(output_path, encoding='utf-8') as f:
+        assert json.load(f)['entries'] == []
+
+
+def test_questions_the_knowledge_index_answers_are_not_prewarmed(paths):
+    log_path, output_path = paths
+    write_log(log_path, ['urea dose for paddy'] * 5 + ['best irrigation for onion'] * 2, language='en')
+    agent = FakeAgent()
+
+    coverage = prewarm_response_cache(agent, log_path, output_path, top_n=1)
+
+    assert agent.asked == [('en', 'best irrigation for onion')]
+    assert coverage == 1.0
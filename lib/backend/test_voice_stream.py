@@ -0,0 +1,133 @@
+import math
+import random
+import struct
+import threading
+import time
+
+from voice_stream import EnergyVAD, VoiceStreamSession
+
+SAMPLE_RATE = 16000
+BYTES_PER_MS = SAMPLE_RATE * 2 // 1000
+FRAME_BYTES = 20 * BYTES_PER_MS
+
+
+def tone(ms, amplitude=5000):
+    samples = SAMPLE_RATE * ms // 1000
+    return struct.pack(f'<{samples}h', *(int(amplitude * math.sin(i / 5)) for i in range(samples)))
+
+
+def silence(ms, seed=0):
+    rng = random.Random(seed)
+    samples = SAMPLE_RATE * ms // 1000
+    return struct.pack(f'<{samples}h', *(rng.randint(-50, 50) for _ in range(samples)))
+
+
+class FakeAgent:
+    def __init__(self, partial_delay=0.0):
+        self.recognized = []
+        self.partial_delay = partial_delay
+
+    def recognize_pcm(self, pcm, sample_rate, language_code):
+        if threading.current_thread() is not threading.main_thread():
+            time.sleep(self.partial_delay)
+            return 'partial text'
+        self.recognized.append(pcm)
+        return 'final text'
+
+    def process_text_query(self, text, language_code):
+        return f"answer to {text}"
+
+    def get_language_name(self, language_code):
+        return language_code
+
+
+def stream(session, audio, chunk_bytes=FRAME_BYTES):
+    for offset in range(0, len(audio), chunk_bytes):
+        if session.feed(audio[offset:offset + chunk_bytes]):
+            return True
+    return False
+
+
+def session_for(agent):
+    sent = []
+    return VoiceStreamSession(agent, 'hi', SAMPLE_RATE, sent.append), sent
+
+
+def test_speech_from_the_first_frame_is_detected_and_kept():
+    agent = FakeAgent()
+    session, sent = session_for(agent)
+    speech = tone(2500)
+
+    assert stream(session, speech + silence(5000))
+
+    assert [message['type'] for message in sent] == ['speech_start', 'final', 'response']
+    assert agent.recognized[0].startswith(speech)
+
+
+def test_first_sentence_before_a_pause_is_kept():
+    agent = FakeAgent()
+    session, sent = session_for(agent)
+    first, second = tone(250), tone(2000)
+
+    assert stream(session, first + silence(500) + second + silence(1500))
+
+    assert agent.recognized[0].startswith(first)
+    assert second in agent.recognized[0]
+
+
+def test_start_and_end_in_one_chunk():
+    agent = FakeAgent()
+    session, sent = session_for(agent)
+    lead = silence(500)
+    speech = tone(2000)
+
+    assert session.feed(lead + speech + silence(1000))
+
+    # Pre-roll is measured from where speech started, not from the end of the chunk
+    pre_roll = agent.recognized[0].index(speech)
+    assert abs(pre_roll - session.pre_roll_bytes) <= session.vad.frame_bytes
+    assert [message['type'] for message in sent] == ['speech_start', 'final', 'response']
+
+
+def test_pre_roll_is_taken_from_the_speech_offset_with_large_chunks():
+    agent = FakeAgent()
+    session, sent = session_for(agent)
+    speech = tone(1500)
+
+    assert stream(session, silence(1700) + speech + silence(1300), chunk_bytes=1000 * BYTES_PER_MS)
+
+    pre_roll = agent.recognized[0].index(speech)
+    assert abs(pre_roll - session.pre_roll_bytes) <= session.vad.frame_bytes
+
+
+def test_silent_stream_is_capped_without_calling_the_recognizer():
+    agent = FakeAgent()
+    session, sent = session_for(agent)
+
+    assert stream(session, silence(VoiceStreamSession.MAX_UTTERANCE_SECONDS * 1000 + 100))
+
+    assert agent.recognized == []
+    assert sent == [{'type': 'error', 'error': 'No speech detected', 'success': False}]
+
+
+def test_late_partial_is_dropped_after_finish():
+    agent = FakeAgent(partial_delay=0.3)
+    session, sent = session_for(agent)
+
+    stream(session, silence(300) + tone(2000))
+    session.finish()
+    time.sleep(0.5)
+
+    assert [message['type'] for message in sent] == ['speech_start', 'final', 'response']
+
+
+def test_vad_reports_event_offsets():
+    vad = EnergyVAD(SAMPLE_RATE)
+    lead = silence(600)
+
+    events = vad.feed(lead + tone(1000) + silence(1000))
+
+    assert [event for event, _ in events] == ['speech_start', 'speech_end']
+    start, end = events[0][1], events[1][1]
+    assert abs(start - len(lead)) < vad.frame_bytes
+    assert end > len(lead) + len(tone(1000))
@@ -0,0 +1,165 @@
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import pytest
+
+from weather_proxy import WeatherProxy, decode_geohash_center, encode_geohash
+
+CURRENT_WEATHER = {
+    'name': 'Shivajinagar',
+    'dt': 1700000000,
+    'coord': {'lat': 18.53, 'lon': 73.85},
+    'weather': [{'id': 800, 'main': 'Clear', 'description': 'clear sky', 'icon': '01d'}],
+    'main': {'temp': 31.2, 'feels_like': 32.0, 'temp_min': 30.1, 'temp_max': 32.4, 'humidity': 40, 'pressure': 1009},
+    'wind': {'speed': 3.1, 'deg': 270},
+    'visibility': 10000
+}
+
+FORECAST = {
+    'cod': '200',
+    'list': [
+        {
+            'dt': 1700010800,
+            'main': {'temp': 29.5, 'humidity': 55, 'pressure': 1008},
+            'weather': [{'id': 500, 'main': 'Rain', 'description': 'light rain', 'icon': '10d'}],
+            'wind': {'speed': 4.2, 'deg': 250},
+            'rain': {'3h': 12.5},
+            'dt_txt': '2023-11-15 03:00:00'
+        },
+        {
+            'dt': 1700021600,
+            'main': {'temp': 27.0, 'humidity': 60},
+            'weather': [{'main': 'Clouds', 'description': 'few clouds'}],
+            'wind': {'speed': 2.0}
+        }
+    ]
+}
+
+GEOCODE = [{'name': 'Pune', 'state': 'Maharashtra', 'country': 'IN', 'lat': 18.52, 'lon': 73.85}]
+
+
+class StandInUpstream:
+    """Local OpenWeatherMap stand-in that counts calls per path"""
+
+    def __init__(self, delay=0.0):
+        self.calls = Counter()
+        self.delay = delay
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = urlparse(self.path).path
+                upstream.calls[path] += 1
+                time.sleep(upstream.delay)
+                body = {
+                    '/data/2.5/weather': CURRENT_WEATHER,
+                    '/data/2.5/forecast': FORECAST,
+                    '/geo/1.0/reverse': GEOCODE
+                }.get(path)
+                self.send_response(200 if body is not None else 404)
+                self.end_headers()
+                self.wfile.write(json.dumps(body).encode('utf-8'))
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def upstream():
+    server = StandInUpstream()
+    yield server
+    server.close()
+
+
+def test_geohash_matches_reference_encoding():
+    assert encode_geohash(57.64911, 10.40744, 11) == 'u4pruydqqvj'
+    lat, lon = decode_geohash_center('u4pruydqqvj')
+    assert abs(lat - 57.64911) < 1e-4
+    assert abs(lon - 10.40744) < 1e-4
+
+
+def test_nearby_coordinates_share_a_bucket():
+    # Two farms ~300 m apart in the same village land in the same ~5 km cell
+    assert encode_geohash(18.5204, 73.8567) == encode_geohash(18.5230, 73.8580)
+    assert encode_geohash(18.5204, 73.8567) != encode_geohash(19.0760, 72.8777)
+
+
+def test_second_request_in_bucket_is_served_from_cache(upstream):
+    proxy = WeatherProxy('test-key', base_url=upstream.base_url)
+
+    first = proxy.current_weather(18.5204, 73.8567)
+    second = proxy.current_weather(18.5230, 73.8580)
+
+    assert first == second
+    assert upstream.calls['/data/2.5/weather'] == 1
+    assert upstream.calls['/geo/1.0/reverse'] == 1
+
+
+def test_concurrent_misses_make_one_upstream_call():
+    upstream = StandInUpstream(delay=0.2)
+    try:
+        proxy = WeatherProxy('test-key', base_url=upstream.base_url)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(proxy.forecast(18.5204, 73.8567)))
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(results) == 10
+        assert all(result == results[0] for result in results)
+        assert upstream.calls['/data/2.5/forecast'] == 1
+    finally:
+        upstream.close()
+
+
+def test_current_weather_payload_is_trimmed(upstream):
+    proxy = WeatherProxy('test-key', base_url=upstream.base_url)
+
+    payload = proxy.current_weather(18.5204, 73.8567)
+
+    assert payload == {
+        'geohash': encode_geohash(18.5204, 73.8567),
+        'name': 'Pune, Maharashtra, IN',
+        'dt': 1700000000,
+        'weather': [{'main': 'Clear', 'description': 'clear sky', 'icon': '01d'}],
+        'main': {'temp': 31.2, 'feels_like': 32.0, 'humidity': 40, 'pressure': 1009},
+        'wind': {'speed': 3.1}
+    }
+
+
+def test_forecast_payload_is_trimmed(upstream):
+    proxy = WeatherProxy('test-key', base_url=upstream.base_url)
+
+    payload = proxy.forecast(18.5204, 73.8567)
+
+    assert payload['list'] == [
+        {
+            'dt': 1700010800,
+            'main': {'temp': 29.5, 'humidity': 55},
+            'weather': [{'main': 'Rain', 'description': 'light rain'}],
+            'wind': {'speed': 4.2},
+            'rain': {'3h': 12.5}
+        },
+        {
+            'dt': 1700021600,
+            'main': {'temp': 27.0, 'humidity': 60},
+            'weather': [{'main': 'Clouds', 'description': 'few clouds'}],
+            'wind': {'speed': 2.0}
+        }
+    ]
@@ -0,0 +1,245 @@
+import sys
+import math
+import array
+import threading
+
+
+class EnergyVAD:
+    """Energy-based voice activity detector for 16-bit mono PCM.
+
+    The first few hundred milliseconds calibrate the noise floor from their
+    quietest frames, capped at min_threshold so a farmer who is already
+    talking is not learned as noise. Speech starts after a few loud frames in
+    a row and ends after a stretch of silence.
+
+    Events carry byte offsets into the stream fed so far. speech_start points
+    at the first loud frame since the last speech_end, which may be earlier
+    than the frames that triggered it (e.g. speech during calibration, or a
+    first sentence followed by a pause); speech_end points at the end of the
+    frame that closed the silence.
+    """
+
+    FRAME_MS = 30
+    # Share of calibration frames treated as background; the rest may be speech
+    CALIBRATION_PERCENTILE = 0.1
+
+    def __init__(self, sample_rate=16000, start_frames=3, end_silence_ms=800,
+                 calibration_ms=300, threshold_ratio=3.0, min_threshold=300.0):
+        self.frame_bytes = int(sample_rate * self.FRAME_MS / 1000) * 2
+        self.start_frames = start_frames
+        self.end_silence_frames = max(1, end_silence_ms // self.FRAME_MS)
+        self.calibration_frames = max(1, calibration_ms // self.FRAME_MS)
+        self.threshold_ratio = threshold_ratio
+        self.min_threshold = min_threshold
+
+        self.noise_floor = None
+        self.first_voiced_offset = None
+        self.position = 0
+        self.voiced_run = 0
+        self.silent_run = 0
+        self.in_speech = False
+        self._calibration = []
+        self._pending = b''
+
+    @property
+    def threshold(self):
+        return max(self.min_threshold, self.noise_floor * self.threshold_ratio)
+
+    def frame_rms(self, frame):
+        samples = array.array('h')
+        samples.frombytes(frame)
+        if sys.byteorder == 'big':
+            samples.byteswap()
+        return math.sqrt(sum(sample * sample for sample in samples) / len(samples)) if samples else 0.0
+
+    def _calibrate(self, offset, rms):
+        self._calibration.append((offset, rms))
+        if len(self._calibration) < self.calibration_frames:
+            return
+        levels = sorted(level for _, level in self._calibration)
+        self.noise_floor = min(levels[int(len(levels) * self.CALIBRATION_PERCENTILE)], self.min_threshold)
+        # Loud calibration frames were speech, not noise; remember where it began
+        for frame_offset, level in self._calibration:
+            if level >= self.threshold:
+                self.first_voiced_offset = frame_offset
+                break
+        self._calibration = []
+
+    def feed(self, pcm):
+        """Consume PCM bytes; returns a list of ('speech_start' | 'speech_end', byte offset) events"""
+        events = []
+        data = self._pending + pcm
+        usable = len(data) - len(data) % self.frame_bytes
+        self._pending = data[usable:]
+
+        for start in range(0, usable, self.frame_bytes):
+            rms = self.frame_rms(data[start:start + self.frame_bytes])
+            offset = self.position
+            self.position += self.frame_bytes
+
+            if self.noise_floor is None:
+                self._calibrate(offset, rms)
+                continue
+
+            if rms >= self.threshold:
+                if self.first_voiced_offset is None:
+                    self.first_voiced_offset = offset
+                self.voiced_run += 1
+                self.silent_run = 0
+                if not self.in_speech and self.voiced_run >= self.start_frames:
+                    self.in_speech = True
+                    events.append(('speech_start', self.first_voiced_offset))
+            else:
+                self.voiced_run = 0
+                self.silent_run += 1
+                # Track slow changes in background noise while nobody is talking
+                if not self.in_speech:
+                    self.noise_floor = self.noise_floor * 0.95 + rms * 0.05
+                elif self.silent_run >= self.end_silence_frames:
+                    self.in_speech = False
+                    self.first_voiced_offset = None
+                    events.append(('speech_end', self.position))
+
+        return events
+
+
+class VoiceStreamSession:
+    """One streaming voice query over a WebSocket.
+
+    Audio is recognized incrementally while the farmer is still speaking and
+    partial transcripts are pushed back; as soon as the VAD reports the end
+    of speech the final transcript goes straight into process_text_query.
+    Everything from shortly before the first loud frame is kept, so speech
+    the VAD only confirmed later is not clipped. The utterance is capped at
+    MAX_UTTERANCE_SECONDS, counted from stream start while nothing was heard.
+    """
+
+    SUPPORTED_SAMPLE_RATES = (8000, 16000, 48000)
+    PARTIAL_INTERVAL_SECONDS = 1.5
+    MAX_UTTERANCE_SECONDS = 30
+    # Keep a little audio from before the first loud frame so the first syllable is not clipped
+    PRE_ROLL_MS = 300
+
+    def __init__(self, agent, language_code, sample_rate, send):
+        self.agent = agent
+        self.language_code = language_code
+        self.sample_rate = sample_rate
+        self.send = send
+        self.vad = EnergyVAD(sample_rate)
+
+        self.bytes_per_second = sample_rate * 2
+        self.pre_roll_bytes = int(self.bytes_per_second * self.PRE_ROLL_MS / 1000) // 2 * 2
+        self.max_utterance_bytes = self.MAX_UTTERANCE_SECONDS * self.bytes_per_second
+        # Buffered audio and its byte offset in the stream
+        self.audio = bytearray()
+        self.audio_start = 0
+        self.received = 0
+        self.speech_started = False
+        self.last_partial_size = 0
+        self._partial_thread = None
+        # Guards `finished` so no partial is sent after the final answer or on a closed socket
+        self._send_lock = threading.Lock()
+        self.finished = False
+
+    def _trim_to(self, offset):
+        """Drop buffered audio before a stream offset"""
+        if offset > self.audio_start:
+            del self.audio[:offset - self.audio_start]
+            self.audio_start = offset
+
+    def feed(self, pcm):
+        """Consume an audio frame; returns True once the query has been answered"""
+        events = self.vad.feed(pcm)
+        self.audio.extend(pcm)
+        self.received += len(pcm)
+
+        for event, offset in events:
+            if event == 'speech_start' and not self.speech_started:
+                self.speech_started = True
+                self._trim_to(offset - self.pre_roll_bytes)
+                self.send({'type': 'speech_start'})
+            elif event == 'speech_end' and self.speech_started:
+                del self.audio[offset - self.audio_start:]
+                self.finish()
+                return True
+
+        if self.vad.first_voiced_offset is not None:
+            self._trim_to(self.vad.first_voiced_offset - self.pre_roll_bytes)
+            utterance_start = self.audio_start
+        else:
+            if self.vad.noise_floor is not None:
+                # Nothing heard yet: only the pre-roll (plus a frame the VAD has not judged) is worth keeping
+                self._trim_to(self.received - self.pre_roll_bytes - self.vad.frame_bytes)
+            utterance_start = 0
+
+        if self.received - utterance_start >= self.max_utterance_bytes:
+            self.finish()
+            return True
+
+        if self.speech_started:
+            self._maybe_send_partial()
+        return False
+
+    def _maybe_send_partial(self):
+        """Re-recognize the audio so far in the background, one request at a time"""
+        new_audio = len(self.audio) - self.last_partial_size
+        if new_audio < self.PARTIAL_INTERVAL_SECONDS * self.bytes_per_second:
+            return
+        if self._partial_thread is not None and self._partial_thread.is_alive():
+            return
+
+        self.last_partial_size = len(self.audio)
+        snapshot = bytes(self.audio)
+
+        def recognize():
+            try:
+                text = self.agent.recognize_pcm(snapshot, self.sample_rate, self.language_code)
+            except Exception as e:
+                print(f"⚠️ Partial recognition failed: {e}")
+                return
+            if not text:
+                return
+            with self._send_lock:
+                if self.finished:
+                    return
+                try:
+                    self.send({'type': 'partial', 'text': text})
+                except Exception as e:
+                    print(f"⚠️ Could not send partial transcript: {e}")
+
+        self._partial_thread = threading.Thread(target=recognize, daemon=True)
+        self._partial_thread.start()
+
+    def close(self):
+        """Drop any partial transcript still being recognized"""
+        with self._send_lock:
+            self.finished = True
+
+    def finish(self):
+        """Run final recognition and answer the query"""
+        self.close()
+        if not self.speech_started and self.vad.first_voiced_offset is None:
+            self.send({'type': 'error', 'error': 'No speech detected', 'success': False})
+            return
+
+        try:
+            text = self.agent.recognize_pcm(bytes(self.audio), self.sample_rate, self.language_code)
+        except Exception as e:
+            print(f"❌ Streaming recognition error: {e}")
+            self.send({'type': 'error', 'error': f"Speech recognition service error: {e}", 'success': False})
+            return
+
+        if not text:
+            self.send({'type': 'error', 'error': 'Could not understand the audio', 'success': False})
+            return
+
+        self.send({'type': 'final', 'text': text})
+        response_text = self.agent.process_text_query(text, self.language_code)
+        self.send({
+            'type': 'response',
+            'success': True,
+            'query': text,
+            'response': response_text,
+            'language': self.language_code,
+            'language_name': self.agent.get_language_name(self.language_code)
+        })
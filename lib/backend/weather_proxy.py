@@ -0,0 +1,226 @@
+import json
+import time
+import threading
+import urllib.parse
+import urllib.request
+
+
+GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+def encode_geohash(lat, lon, precision=5):
+    """Encode a coordinate as a geohash; precision 5 is a cell of roughly 5 x 5 km"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even_bit = True
+
+    while len(geohash) < precision:
+        if even_bit:
+            mid = (lon_range[0] + lon_range[1]) / 2
+            if lon >= mid:
+                bits = (bits << 1) | 1
+                lon_range[0] = mid
+            else:
+                bits = bits << 1
+                lon_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if lat >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits = bits << 1
+                lat_range[1] = mid
+
+        even_bit = not even_bit
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return ''.join(geohash)
+
+def decode_geohash_center(geohash):
+    """Return the (lat, lon) centre of a geohash cell"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even_bit = True
+
+    for char in geohash:
+        value = GEOHASH_BASE32.index(char)
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            target = lon_range if even_bit else lat_range
+            mid = (target[0] + target[1]) / 2
+            if bit:
+                target[0] = mid
+            else:
+                target[1] = mid
+            even_bit = not even_bit
+
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+class SharedTTLCache:
+    """Thread-safe TTL cache that coalesces concurrent misses for the same key.
+
+    The first caller for a missing key runs the fetch; callers arriving while
+    it is in flight wait for that result instead of issuing their own.
+    """
+
+    def __init__(self, max_entries=5000):
+        self.max_entries = max_entries
+        self._entries = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._evict()
+
+    def get_or_fetch(self, key, ttl, fetch):
+        """Return a fresh cached value, running fetch() at most once per miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                return entry[1]
+
+            call = self._inflight.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = {'event': threading.Event(), 'value': None, 'error': None}
+                self._inflight[key] = call
+
+        if not is_leader:
+            call['event'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['value']
+
+        try:
+            value = fetch()
+            call['value'] = value
+            self.set(key, value, ttl)
+            return value
+        except Exception as e:
+            call['error'] = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call['event'].set()
+
+    def _evict(self):
+        """Drop expired entries, then the soonest-expiring ones, once over capacity"""
+        if len(self._entries) <= self.max_entries:
+            return
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[key]
+        overflow = len(self._entries) - self.max_entries
+        if overflow > 0:
+            for key, _ in sorted(self._entries.items(), key=lambda item: item[1][0])[:overflow]:
+                del self._entries[key]
+
+def fetch_json(url, params=None, timeout=10):
+    """GET a JSON document from an upstream API"""
+    if params:
+        url = f"{url}?{urllib.parse.urlencode(params)}"
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+class WeatherProxy:
+    """OpenWeatherMap proxy that buckets coordinates by geohash.
+
+    Every farmer in the same ~5 km cell shares one upstream call per TTL, and
+    payloads are trimmed to the fields the Flutter weather page reads.
+    """
+
+    WEATHER_TTL = 10 * 60
+    FORECAST_TTL = 30 * 60
+    GEOCODE_TTL = 24 * 60 * 60
+
+    def __init__(self, api_key, base_url='https://api.openweathermap.org', precision=5, cache=None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.precision = precision
+        self.cache = cache or SharedTTLCache()
+
+    def _bucket(self, lat, lon):
+        geohash = encode_geohash(lat, lon, self.precision)
+        center_lat, center_lon = decode_geohash_center(geohash)
+        return geohash, round(center_lat, 4), round(center_lon, 4)
+
+    def _upstream(self, path, lat, lon, **extra):
+        params = {'lat': lat, 'lon': lon, 'appid': self.api_key}
+        params.update(extra)
+        return fetch_json(f"{self.base_url}{path}", params)
+
+    def _location_name(self, geohash, lat, lon):
+        """Reverse-geocode a bucket to 'City, State, Country'; empty string on failure"""
+        def fetch():
+            places = self._upstream('/geo/1.0/reverse', lat, lon, limit=1)
+            if not places:
+                return ''
+            place = places[0]
+            parts = [place.get('name') or '']
+            if place.get('state') and place.get('state') != place.get('name'):
+                parts.append(place['state'])
+            if place.get('country'):
+                parts.append(place['country'])
+            return ', '.join(part for part in parts if part)
+
+        # Failures are not cached, so the next miss retries the lookup
+        try:
+            return self.cache.get_or_fetch(('geo', geohash), self.GEOCODE_TTL, fetch)
+        except Exception as e:
+            print(f"⚠️ Reverse geocoding failed for {geohash}: {e}")
+            return ''
+
+    def current_weather(self, lat, lon):
+        geohash, bucket_lat, bucket_lon = self._bucket(lat, lon)
+
+        def fetch():
+            data = self._upstream('/data/2.5/weather', bucket_lat, bucket_lon, units='metric')
+            location = self._location_name(geohash, bucket_lat, bucket_lon)
+            main = data.get('main', {})
+            return {
+                'geohash': geohash,
+                'name': location or data.get('name', ''),
+                'dt': data.get('dt'),
+                'weather': [
+                    {'main': w.get('main'), 'description': w.get('description'), 'icon': w.get('icon')}
+                    for w in data.get('weather', [])[:1]
+                ],
+                'main': {key: main.get(key) for key in ('temp', 'feels_like', 'humidity', 'pressure')},
+                'wind': {'speed': data.get('wind', {}).get('speed')}
+            }
+
+        return self.cache.get_or_fetch(('weather', geohash), self.WEATHER_TTL, fetch)
+
+    def forecast(self, lat, lon):
+        geohash, bucket_lat, bucket_lon = self._bucket(lat, lon)
+
+        def fetch():
+            data = self._upstream('/data/2.5/forecast', bucket_lat, bucket_lon, units='metric')
+            items = []
+            for item in data.get('list', []):
+                main = item.get('main', {})
+                trimmed = {
+                    'dt': item.get('dt'),
+                    'main': {'temp': main.get('temp'), 'humidity': main.get('humidity')},
+                    'weather': [
+                        {'main': w.get('main'), 'description': w.get('description')}
+                        for w in item.get('weather', [])[:1]
+                    ],
+                    'wind': {'speed': item.get('wind', {}).get('speed')}
+                }
+                if 'rain' in item and '3h' in item['rain']:
+                    trimmed['rain'] = {'3h': item['rain']['3h']}
+                items.append(trimmed)
+            return {'geohash': geohash, 'list': items}
+
+        return self.cache.get_or_fetch(('forecast', geohash), self.FORECAST_TTL, fetch)